@@ -429,4 +429,5 @@ class Calculator(object):
                               str(price_lut_gen_part[date]),
                               '-'] for date in src_dates],
                             False)
+        db.flush()
         return (price_lut_gen_part, price_lut_gen_full)
@@ -1,12 +1,47 @@
-import errno
+import csv
+import mmap
 import os
 import os.path
+import re
 import datetime
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
+
+
+class StockFrame(namedtuple('StockFrame', ['dates', 'open', 'high', 'low',
+                                           'close', 'volume'])):
+
+    """Stock data for a ticker in column-by-column format, with the
+    numbers already converted from strings.
+
+    Each numeric column is a packed array of floats rather than a list
+    of strings, so consumers that only need e.g. closing prices don't
+    pay for the other columns. Values that are missing in a file (the
+    '-' placeholders in generated data) are NaN.
+
+    Attributes:
+        dates: An array of date strings
+        open: An array of opening prices
+        high: An array of high prices
+        low: An array of low prices
+        close: An array of closing prices
+        volume: An array of volumes
+    """
+
+    __slots__ = ()
 
 
 class DataManager(object):
 
     DATE_FORMAT = '%Y-%m-%d'
+    MAX_QUEUED_SIZE = 1 << 24
+    # bumped for a file whenever it's written, shared by all DataManagers
+    _generations = {}
+    # e.g. 'SPY~PRICE > SPY~SMA_100' -> ('SPY', 'PRICE', 'SPY', 'SMA_100')
+    SIGNAL_PATTERN = re.compile(
+        r'^([^~\s]+)~([^~\s]+) \S+ ([^~\s]+)~([^~\s]+)$')
 
     """A DataManager is responsible for managing (i.e. storing and
     retrieving) data on disk.
@@ -18,9 +53,22 @@ class DataManager(object):
     wrappers for low level or commonly used and simple, but ugly to
     write actions.
 
+    Closing prices are also cached in a packed binary format next to
+    each CSV file, which is much cheaper to load for price LUTs than
+    parsing the CSV again. The CSV file stays the source of truth.
+
+    Writes are queued in memory and only hit the disk on flush(), so
+    that many tickers can be written back to back in one go. To bound
+    memory use, the queue is also flushed once it grows past
+    MAX_QUEUED_SIZE bytes. Files are only synced to disk one by one if
+    durable writes are asked for, otherwise commit() just syncs the data
+    dir once, so bulk loads don't pay for a sync per file.
+
     Attributes:
         data_location: A string indicating where the stock data is
             stored on disk
+        durable_writes: A boolean indicating whether every flushed file
+            is synced to disk right away
 
     Todo:
         - [code improvement, low priority] create independent market
@@ -31,18 +79,28 @@ class DataManager(object):
             columns to return map
     """
 
-    def __init__(self, data_location='data/'):
+    def __init__(self, data_location='data/', durable_writes=False):
         """Inits DataManager with a data location.
 
         Args:
             data_location: (optional) A string representing where the
                 data dir will be on disk, default: ./data/
+            durable_writes: (optional) A boolean for whether or not to
+                sync every file to disk as it's flushed, default: False
         """
         self.data_location = data_location
+        self.durable_writes = durable_writes
+        self._data_location_prefix = os.fspath(self.data_location)
+        self._pending = {}
+        self._queued_size = 0
+        self._truncating = set({})
         os.makedirs(self.data_location, exist_ok=True)
 
     def write_stock_data(self, ticker, data, append):
-        """Writes an array of data to a file on disk.
+        """Queues an array of data to be written to a file on disk.
+
+        NOTE: nothing is written to disk until flush() is called, or
+        until the queue grows past MAX_QUEUED_SIZE
 
         Args:
             ticker: A string representing the ticker of a stock
@@ -51,24 +109,89 @@ class DataManager(object):
             append: A boolean representing whether or not to append to
                 existing data
         """
+        filename = self._filename_for(ticker)
         data_to_write = []
         if append:
-            mode = 'a'
-            existing_data = self.read_stock_data(ticker, 'row')
-            if len(existing_data) == 0:
+            # only the last stored date matters, so avoid reading it all
+            last_date = self._last_line_for(ticker).split(',')[0]
+            if len(last_date) == 0:
                 data_to_write = data
-            elif (existing_data[-1][0] < data[-1][0] and
-                  existing_data[-1][0] > data[0][0]):
-                index_of_last = next(i for i, _ in enumerate(data)
-                                     if _[0] == existing_data[-1][0])
+            elif last_date < data[-1][0] and last_date > data[0][0]:
+                # data is in chronological order, so binary search it
+                dates = [line[0] for line in data]
+                index_of_last = bisect_right(dates, last_date) - 1
                 data_to_write = data[index_of_last + 1:]
         else:
-            mode = 'w'
+            # the old data is only replaced once the new data is flushed
             data_to_write = data
-            if self._has_file_for(ticker):
-                self._remove_file_for(ticker)
-        self._write_data_to_csv_file(
-            self._filename_for(ticker), data_to_write, mode)
+            self._queued_size -= len(self._pending.pop(filename, b''))
+            self._truncating.add(filename)
+        self._queue_data_for_csv_file(filename, data_to_write)
+
+    def flush(self):
+        """Writes all queued data to disk, one file after another, and
+        empties the queue.
+        """
+        flushed = len(self._pending) > 0
+        # drop each file from the queue once written, so retries skip it
+        for (filename, buffer) in list(self._pending.items()):
+            flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT
+            truncating = filename in self._truncating
+            if truncating:
+                flags |= os.O_TRUNC
+            fd = os.open(filename, flags, 0o666)
+            # already truncated, so a retry has to append
+            self._truncating.discard(filename)
+            written = 0
+            try:
+                with memoryview(buffer) as view:
+                    while written < len(view):
+                        written += os.write(fd, view[written:])
+                if self.durable_writes:
+                    os.fsync(fd)
+            except BaseException:
+                # re-queue what's left, so a retry resumes there
+                # NOTE: a copy, the failed write may still hold a view of
+                # the buffer, which stops it from being resized
+                self._pending[filename] = buffer[written:]
+                raise
+            finally:
+                os.close(fd)
+                self._queued_size -= written
+                # unchanged files keep their cached lines and prices
+                if truncating or written > 0:
+                    DataManager._generations[filename] = \
+                        DataManager._generations.get(filename, 0) + 1
+                    self._remove_binary_files(filename)
+            del self._pending[filename]
+        # sync new files' dir entries too
+        if self.durable_writes and flushed:
+            self._sync_data_location()
+
+    def commit(self):
+        """Flushes all queued data and syncs the data dir to disk once,
+        so the entries of any newly created files are durable.
+
+        NOTE: the contents of flushed files are only synced to disk
+        with durable_writes, otherwise that's left to the OS
+        """
+        self.flush()
+        # durable flushes have already synced the data dir themselves
+        if not self.durable_writes:
+            self._sync_data_location()
+
+    def _sync_data_location(self):
+        """Syncs the data dir to disk, so that the entries of any newly
+        created files in it are durable.
+        """
+        # NOTE: directories can only be opened and synced on POSIX
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self._data_location_prefix,
+                         os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
 
     def read_stock_data(self, ticker, format):
         """Retrieves stock data for a given ticker in a given format
@@ -77,16 +200,18 @@ class DataManager(object):
         Args:
             ticker: A string representing the ticker of a stock
             format: A string representing whether the data should be in
-                'column' or 'row' format
+                'column', 'row' or 'frame' format
 
         Returns:
             An array in either row or column format contaning the data
-                for a given stock
+                for a given stock, or a StockFrame in frame format
         """
         if format == 'column':
             return self._read_csv_file_columns_for(ticker)
         if format == 'row':
             return self._read_csv_file_rows_for(ticker)
+        if format == 'frame':
+            return self._read_stock_frame_for(ticker)
         return []
 
     def build_price_lut(self, ticker, fill=True):
@@ -102,33 +227,19 @@ class DataManager(object):
         Returns:
             A dictionary with dates as keys and prices as values
         """
-        price_lookup = {}
-        file_content = self._readlines_for(ticker)
-        # handle corner cases with empty or single-line files
-        if len(file_content) == 0:
-            return price_lookup
-        if len(file_content) == 1:
-            line_data = file_content[i].split(',')
-            return {line_data[0]: float(line_data[4])}
-        # handle multi-line files & fill in holes with previous data
-        for i in range(0, len(file_content) - 1):
-            curr_line_data = file_content[i].split(',')
-            next_line_data = file_content[i + 1].split(',')
-            curr_date = datetime.datetime.strptime(
-                curr_line_data[0], DataManager.DATE_FORMAT)
-            next_date = datetime.datetime.strptime(
-                next_line_data[0], DataManager.DATE_FORMAT)
-            while curr_date < next_date:
-                price_lookup[curr_date.strftime(DataManager.DATE_FORMAT)] \
-                    = float(curr_line_data[4])
-                if fill:
-                    curr_date = curr_date + datetime.timedelta(1)
-                else:
-                    curr_date = next_date
-        # handle last line in file separately
-        price_lookup[next_date.strftime(
-            DataManager.DATE_FORMAT)] = float(next_line_data[4])
-        return price_lookup
+        (days, closes) = self._read_prices_for(ticker)
+        if fill:
+            (days, closes) = self._fill_holes(days, closes)
+        elif len(days) > 0:
+            # only keep days followed by a later day, plus the last day
+            kept = [i for i in range(0, len(days) - 1)
+                    if days[i] < days[i + 1]] + [len(days) - 1]
+            days = [days[i] for i in kept]
+            closes = [closes[i] for i in kept]
+        # turn the day ordinals back into date strings
+        dates = map(datetime.date.isoformat,
+                    map(datetime.date.fromordinal, days))
+        return dict(zip(dates, closes))
 
     def build_strategy(self, strategy_name, strategy_dir='./'):
         """Given a strategy name (the name of the file within which
@@ -148,27 +259,27 @@ class DataManager(object):
             Market
         """
         lines = self._readlines(strategy_dir + strategy_name)
-        stocks_needed = set({})
-        indicators_needed = set({})
+        # each line is in ratio,ticker,buy_signal,sell_signal format
+        codes = [line.split(',') for line in lines]
+        positions = [{
+            'is_holding': False,
+            'ratio': float(ratio),
+            'ticker': self._up(ticker),
+            'buy_signal': buy_signal,
+            'sell_signal': sell_signal
+        } for (ratio, ticker, buy_signal, sell_signal) in codes]
+        signals = [self._parse_signal(signal)
+                   for (_, _, buy_signal, sell_signal) in codes
+                   for signal in [buy_signal, sell_signal]]
         strategy = {
-            'assets': set({}),
-            'positions': []
+            'assets': {position['ticker'] for position in positions},
+            'positions': positions
         }
-        for line in lines:
-            (ratio, ticker, buy_signal, sell_signal) = line.split(',')
-            strategy['assets'].add(ticker.upper())
-            stocks_needed.add(ticker.upper())
-            for signal in [buy_signal, sell_signal]:
-                (tickers, indicators) = self._parse_signal(signal)
-                stocks_needed |= tickers
-                indicators_needed |= indicators
-            strategy['positions'].append({
-                'is_holding': False,
-                'ratio': float(ratio),
-                'ticker': ticker.upper(),
-                'buy_signal': buy_signal,
-                'sell_signal': sell_signal
-            })
+        # build the sets in one go
+        stocks_needed = strategy['assets'].union(
+            *[tickers for (tickers, _) in signals])
+        indicators_needed = set({}).union(
+            *[indicators for (_, indicators) in signals])
         return (strategy, stocks_needed, indicators_needed)
 
     def _parse_signal(self, signal_code):
@@ -182,28 +293,36 @@ class DataManager(object):
             A tuple containing a set of tickers and a set of indicators
         """
         if signal_code in ['ALWAYS', 'NEVER']:
-            return (set({}), set({}))
-        tickers = set({})
-        indicators = set({})
-        (val_a_code, _, val_b_code) = signal_code.split(' ')
-        for code in [val_a_code, val_b_code]:
-            (ticker, indicator) = code.split('~')
-            tickers.add(ticker.upper())
-            if indicator not in ['PRICE']:
-                indicators.add(indicator.upper())
+            return (frozenset(), frozenset())
+        match = DataManager.SIGNAL_PATTERN.match(signal_code)
+        if match is None:
+            raise ValueError('Invalid signal: {}'.format(signal_code))
+        (ticker_a, indicator_a, ticker_b, indicator_b) = match.groups()
+        tickers = {self._up(ticker_a), self._up(ticker_b)}
+        indicators = {self._up(indicator)
+                      for indicator in [indicator_a, indicator_b]
+                      if indicator not in ['PRICE']}
         return (tickers, indicators)
 
-    def _write_data_to_csv_file(self, filename, data, mode):
-        """Writes an array of data to disk in CSV format.
+    def _queue_data_for_csv_file(self, filename, data):
+        """Queues an array of data to be appended to a file on disk in
+        CSV format on the next flush.
 
         Args:
             filename: A string representing the file to which to write
             data: An array in [[date,open,high,low,close,volume],...]
                 format
         """
-        with open(filename, mode) as file:
-            for line in data:
-                file.write(','.join(line) + '\n')
+        # queue even without data, so flush still creates the file
+        buffer = self._pending.setdefault(filename, bytearray())
+        if len(data) > 0:
+            # encode straight into the queue, without copying the payload
+            size = len(buffer)
+            buffer += '\n'.join(','.join(line) for line in data).encode()
+            buffer += b'\n'
+            self._queued_size += len(buffer) - size
+            if self._queued_size > DataManager.MAX_QUEUED_SIZE:
+                self.flush()
 
     def _filename_for(self, ticker):
         """Returns the file name for a ticker, including the path to
@@ -216,7 +335,22 @@ class DataManager(object):
             A String representing the filename, inluding path, for the
             given ticker
         """
-        return self.data_location + ticker.upper() + ".csv"
+        return os.path.join(self._data_location_prefix,
+                            self._up(ticker) + ".csv")
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _up(ticker):
+        """Returns the uppercase version of a ticker, cached since the
+        same few tickers are uppercased over and over.
+
+        Args:
+            ticker: A string representing the ticker of a stock
+
+        Returns:
+            A string representing the uppercase ticker
+        """
+        return ticker.upper()
 
     def _readlines(self, filename):
         """Returns the lines of the file for a given ticker.
@@ -243,11 +377,90 @@ class DataManager(object):
             An array with each element containing a line of the file
             for the given ticker
         """
-        lines = []
-        if self._has_file_for(ticker):
-            with open(self._filename_for(ticker), 'r') as file:
-                lines = [line.strip() for line in file]
-        return lines
+        filename = self._filename_for(ticker)
+        # make sure queued data is on disk before reading it back
+        if filename in self._pending:
+            self.flush()
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return []
+        # a changed file gets a new cache key
+        return self._cached_lines(filename,
+                                  DataManager._generations.get(filename, 0),
+                                  stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _cached_lines(filename, generation, mtime_ns, size):
+        """Returns the lines of a file, cached so that the same file
+        is only read from disk once for as long as it doesn't change.
+
+        Args:
+            filename: A string representing the name of a file
+            generation: A value for how many times this program has
+                written the file
+            mtime_ns: A value for the modification time of the file
+            size: A value for the size of the file
+
+        Returns:
+            A tuple with each element containing a line of the file
+        """
+        # NOTE: mmap can't map an empty file, so treat it as no lines
+        if size == 0:
+            return ()
+        # decode from the map directly, without copying it to bytes
+        with DataManager._mmap(filename) as mapped:
+            return tuple(str(mapped, 'utf-8').splitlines())
+
+    def _last_line_for(self, ticker):
+        """Returns the last non-empty line of the file for a given
+        ticker, reading backwards from the end of the file in chunks
+        rather than reading the whole file.
+
+        Args:
+            ticker: A string representing the ticker of a stock
+
+        Returns:
+            A string containing the last line of the file for the given
+            ticker, or an empty string if there is no such line
+        """
+        # queued data goes after what's on disk, so it has the last line
+        queued = self._pending.get(self._filename_for(ticker), b'').rstrip()
+        if len(queued) > 0:
+            return queued.rsplit(b'\n', 1)[-1].strip().decode()
+        # what's on disk will be replaced, so it has no lines that count
+        if self._filename_for(ticker) in self._truncating:
+            return ''
+        try:
+            file = open(self._filename_for(ticker), 'rb')
+        except FileNotFoundError:
+            return ''
+        with file:
+            end = file.seek(0, os.SEEK_END)
+            tail = b''
+            while end > 0:
+                start = max(0, end - 512)
+                file.seek(start)
+                tail = file.read(end - start) + tail
+                end = start
+                # stop once the last line is known to be complete
+                if b'\n' in tail.rstrip():
+                    break
+        return tail.rstrip().rsplit(b'\n', 1)[-1].strip().decode()
+
+    @staticmethod
+    def _mmap(filename):
+        """Returns a read-only memory map of a file.
+
+        Args:
+            filename: A string representing the name of a file
+
+        Returns:
+            An mmap object mapping the whole file
+        """
+        with open(filename, 'rb') as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
 
     def _has_file(self, filename):
         """Returns whether a file exists.
@@ -260,25 +473,159 @@ class DataManager(object):
         """
         return os.path.isfile(filename)
 
-    def _has_file_for(self, ticker):
-        """Returns whether a file for a given ticker exists.
+    def _binary_filenames(self, filename):
+        """Returns the file names of the binary date and closing price
+        files that go with a CSV file.
+
+        Args:
+            filename: A string representing the CSV file
+
+        Returns:
+            A tuple of strings representing the date file and the
+            closing price file, including path
+        """
+        root = os.path.splitext(filename)[0]
+        return (root + '.dates.bin', root + '.close.bin')
+
+    def _remove_binary_files(self, filename):
+        """Removes the binary files that go with a CSV file, if any,
+        e.g. because they're no longer up to date.
+
+        Args:
+            filename: A string representing the CSV file
+        """
+        for binary_filename in self._binary_filenames(filename):
+            try:
+                os.remove(binary_filename)
+            except FileNotFoundError:
+                pass
+
+    def _write_binary_for(self, ticker, stamp, days, closes):
+        """Writes the binary date and closing price files for a given
+        ticker.
+
+        Dates are stored as 32 bit day ordinals. Closing prices are
+        stored as 64 bit floats, since generated data is stored at full
+        precision and should come back exactly as it was written. Both
+        files start with a stamp of the CSV file they were built from.
 
         Args:
             ticker: A string representing the ticker of a stock
+            stamp: An array('q') of the CSV file's size and mtime_ns
+            days: An array('i') of dates as day ordinals
+            closes: An array('d') of closing prices
+        """
+        (dates_filename, close_filename) = \
+            self._binary_filenames(self._filename_for(ticker))
+        for (binary_filename, values) in [(dates_filename, days),
+                                          (close_filename, closes)]:
+            with open(binary_filename, 'wb') as file:
+                stamp.tofile(file)
+                values.tofile(file)
+
+    def _read_binary_file(self, filename, typecode, stamp):
+        """Reads and returns the values in a binary file, as long as it
+        was built from the CSV file with the given stamp.
+
+        Args:
+            filename: A string representing the binary file
+            typecode: A string representing the array typecode of the
+                values in the file
+            stamp: An array('q') of the CSV file's size and mtime_ns
 
         Returns:
-            A boolean value representing whether or not a file exists
-            for a given ticker
+            An array of the values in the file, or None if the file is
+            missing or was built from a different version of the CSV
         """
-        return os.path.isfile(self._filename_for(ticker))
+        try:
+            with open(filename, 'rb') as file:
+                content = memoryview(file.read())
+        except FileNotFoundError:
+            return None
+        header_size = len(stamp) * stamp.itemsize
+        if content[:header_size] != stamp.tobytes():
+            return None
+        values = array(typecode)
+        if (len(content) - header_size) % values.itemsize != 0:
+            return None
+        values.frombytes(content[header_size:])
+        return values
+
+    def _fill_holes(self, days, closes):
+        """Fills in holes (i.e. holidays/weekends) in a series of dates
+        and closing prices with the previous day's price.
+
+        Works purely on day ordinals and floats, a whole hole at a time.
+
+        Args:
+            days: An array('i') of dates as day ordinals, in
+                chronological order
+            closes: An array('d') of closing prices corresponding to
+                the days
 
-    def _remove_file_for(self, ticker):
-        """Removes the file for the given ticker.
+        Returns:
+            A tuple containing an array('i') of every day from the
+            first to the last day, and an array('d') of the closing
+            prices for those days
+        """
+        filled_days = array('i')
+        filled_closes = array('d')
+        # handle corner case with empty files
+        if len(days) == 0:
+            return (filled_days, filled_closes)
+        extend_days = filled_days.extend
+        extend_closes = filled_closes.extend
+        for i in range(0, len(days) - 1):
+            hole = days[i + 1] - days[i]
+            if hole > 0:
+                extend_days(range(days[i], days[i + 1]))
+                extend_closes(closes[i:i + 1] * hole)
+        # handle last day separately
+        filled_days.append(days[-1])
+        filled_closes.append(closes[-1])
+        return (filled_days, filled_closes)
+
+    def _read_prices_for(self, ticker):
+        """Reads and returns the dates and closing prices for a given
+        ticker, from its binary files if they're up to date, or else
+        from its CSV file, in which case the binary files are written
+        for next time.
 
         Args:
             ticker: A string representing the ticker of a stock
+
+        Returns:
+            A tuple containing an array('i') of dates as day ordinals
+            and an array('d') of closing prices
         """
-        os.remove(self._filename_for(ticker))
+        filename = self._filename_for(ticker)
+        if filename in self._pending:
+            self.flush()
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return (array('i'), array('d'))
+        # only use binary files built from exactly this version of the csv
+        stamp = array('q', [stat.st_size, stat.st_mtime_ns])
+        (dates_filename, close_filename) = self._binary_filenames(filename)
+        days = self._read_binary_file(dates_filename, 'i', stamp)
+        closes = self._read_binary_file(close_filename, 'd', stamp)
+        if days is not None and closes is not None \
+                and len(days) == len(closes):
+            return (days, closes)
+        # only dates and closing prices are needed here
+        columns = self._read_csv_file_columns_for(ticker)
+        # dates are stored in ISO format (see DATE_FORMAT)
+        days = array('i', map(datetime.date.toordinal,
+                              map(datetime.date.fromisoformat, columns[0])))
+        # a missing close is an error, rather than a NaN price to trade on
+        closes = array('d', map(float, columns[4]))
+        # the binary files are only an optimization, e.g. for read-only dirs
+        try:
+            self._write_binary_for(ticker, stamp, days, closes)
+        except OSError:
+            pass
+        return (days, closes)
 
     def _read_csv_file_rows_for(self, ticker):
         """Reads and returns the data in a CSV file for a given ticker
@@ -291,11 +638,7 @@ class DataManager(object):
             An array, where each element is an array containing data
             for a row in a CSV file
         """
-        data = []
-        file_content = self._readlines_for(ticker)
-        for line in file_content:
-            data.append([value.strip() for value in line.split(',')])
-        return data
+        return list(csv.reader(self._readlines_for(ticker)))
 
     def _read_csv_file_columns_for(self, ticker):
         """Reads and returns the data in a CSV file for a given ticker
@@ -308,14 +651,48 @@ class DataManager(object):
             An array, where each element is an array containing data
             for a column in a CSV file
         """
-        data = []
         file_content = self._readlines_for(ticker)
-        # create arrays for each column
-        for i in range(0, 6):
-            data.append([])
-        # iterate through file
-        for line in file_content:
-            values = line.split(',')
-            for i in range(0, 6):
-                data[i].append(values[i].strip())
-        return data
+        # handle corner case with empty files, still one array per column
+        if len(file_content) == 0:
+            return [[], [], [], [], [], []]
+        # stock files always have the same 6 unquoted columns
+        (dates, opens, highs, lows, closes, volumes) = \
+            zip(*[line.split(',') for line in file_content])
+        return [list(dates), list(opens), list(highs), list(lows),
+                list(closes), list(volumes)]
+
+    def _read_stock_frame_for(self, ticker):
+        """Reads and returns the data in a CSV file for a given ticker
+        as a StockFrame.
+
+        Args:
+            ticker: A string representing the ticker of a stock
+
+        Returns:
+            A StockFrame containing the data in the CSV file
+        """
+        columns = self._read_csv_file_columns_for(ticker)
+        return StockFrame(columns[0],
+                          *[self._to_floats(column) for column in columns[1:]])
+
+    def _to_floats(self, values):
+        """Converts an array of number strings to a packed array of
+        floats, using NaN for any value which isn't a number.
+
+        Args:
+            values: An array of strings representing numbers
+
+        Returns:
+            An array of floats corresponding to the given values
+        """
+        try:
+            return array('d', map(float, values))
+        except ValueError:
+            # slow path for columns with placeholders, e.g. '-'
+            floats = array('d')
+            for value in values:
+                try:
+                    floats.append(float(value))
+                except ValueError:
+                    floats.append(float('nan'))
+            return floats
@@ -179,19 +179,23 @@ def download_and_write(ticker, source):
 def main():
     """Wrapper for main logic."""
     args = parser.parse_args()
-    # handle downloading from list of files
-    if args.download_from:
-        for file_with_tickers in args.download_from:
-            with open(file_with_tickers, 'r') as file:
-                lines = file.readlines()
-            for line in lines:
-                download_and_write(line.strip(), args.using)
-        exit()
-    # handle downlaoding from list of tickers
-    if args.download:
-        for ticker in args.download:
-            download_and_write(ticker, args.using)
-        exit()
+    # commit even if a download fails, to keep the tickers downloaded so far
+    try:
+        # handle downloading from list of files
+        if args.download_from:
+            for file_with_tickers in args.download_from:
+                with open(file_with_tickers, 'r') as file:
+                    lines = file.readlines()
+                for line in lines:
+                    download_and_write(line.strip(), args.using)
+            exit()
+        # handle downlaoding from list of tickers
+        if args.download:
+            for ticker in args.download:
+                download_and_write(ticker, args.using)
+            exit()
+    finally:
+        db.commit()
 
 
 if __name__ == "__main__":